@@ -1 +1,4 @@
 from .extension import *
+from .bulk import *
+from .commands import *
+from .spatial import *
@@ -0,0 +1,173 @@
+__all__ = ["ImageSequenceReport", "find_image_sequence_prims", "layout_image_sequences", "relayout_image_sequences"]
+
+import copy
+import os
+import time
+from glob import glob
+from typing import Dict, List, Optional, Set
+
+import carb
+from pxr import Sdf, Usd
+
+from .config import Config, get_config_metadata, set_config_metadata
+from .core import apply_image_sequence_transforms, calculate_transforms, probe_image_sizes
+from .spatial import update_spatial_index
+
+
+class ImageSequenceReport:
+    prim_path: str
+    previous_config: Optional[Config]
+    missing_files: List[str]
+    unreadable_files: List[str]
+    new_files: List[str]
+    changed_prim_count: int
+    skipped: bool
+    error: Optional[str]
+    decode_seconds: float
+    layout_seconds: float
+    apply_seconds: float
+
+
+def find_image_sequence_prims(stage: Usd.Stage) -> List[Usd.Prim]:
+    # A single traversal of the stage. Image sequences are never nested, so we
+    # don't descend into the quads of a sequence once its root has been found.
+    prims: List[Usd.Prim] = []
+    prim_range = iter(Usd.PrimRange(stage.GetPseudoRoot()))
+    for prim in prim_range:
+        prim: Usd.Prim
+        if prim.HasAttribute("imageseq:config"):
+            prims.append(prim)
+            prim_range.PruneChildren()
+    return prims
+
+
+def _new_report(prim_path: str) -> ImageSequenceReport:
+    report = ImageSequenceReport()
+    report.prim_path = prim_path
+    report.previous_config = None
+    report.missing_files = []
+    report.unreadable_files = []
+    report.new_files = []
+    report.changed_prim_count = 0
+    report.skipped = False
+    report.error = None
+    report.decode_seconds = 0.0
+    report.layout_seconds = 0.0
+    report.apply_seconds = 0.0
+    return report
+
+
+def relayout_image_sequences(
+    stage: Usd.Stage,
+    ppi: Optional[int] = None,
+    gap_pct: Optional[float] = None,
+    curve_pct: Optional[float] = None,
+    images_per_row: Optional[int] = None,
+) -> Dict[str, ImageSequenceReport]:
+    """
+    Recompute the layout of every image sequence on the stage, optionally
+    overriding some layout parameters. Sequences that reference missing or
+    unreadable files are reported and left untouched.
+    """
+    reports: Dict[str, ImageSequenceReport] = {}
+    if stage is None:
+        carb.log_warn("Unexpected: stage is none")
+        return reports
+
+    configs: Dict[str, Config] = {}
+    for prim in find_image_sequence_prims(stage):
+        report = _new_report(str(prim.GetPath()))
+        start = time.perf_counter()
+        config = get_config_metadata(prim)
+        report.decode_seconds = time.perf_counter() - start
+        if config is None:
+            continue
+        report.previous_config = copy.copy(config)
+        if ppi is not None:
+            config.ppi = ppi
+        if gap_pct is not None:
+            config.gap_pct = gap_pct
+        if curve_pct is not None:
+            config.curve_pct = curve_pct
+        if images_per_row is not None:
+            config.images_per_row = images_per_row
+        configs[report.prim_path] = config
+        reports[report.prim_path] = report
+    _layout(stage, configs, reports)
+    return reports
+
+
+def layout_image_sequences(stage: Usd.Stage, configs: Dict[str, Config]) -> Dict[str, ImageSequenceReport]:
+    """
+    Lay out each image sequence with the given config, keyed by prim path, in
+    the same batched pass as relayout_image_sequences.
+    """
+    reports: Dict[str, ImageSequenceReport] = {}
+    if stage is None:
+        carb.log_warn("Unexpected: stage is none")
+        return reports
+    for prim_path in configs:
+        reports[prim_path] = _new_report(prim_path)
+    _layout(stage, configs, reports)
+    return reports
+
+
+def _layout(stage: Usd.Stage, configs: Dict[str, Config], reports: Dict[str, ImageSequenceReport]) -> None:
+    # Check and probe the union of all referenced images exactly once
+    unique_paths: Set[str] = set()
+    for config in configs.values():
+        unique_paths.update(config.expanded_glob)
+    existing_paths = {image_path for image_path in unique_paths if os.path.isfile(image_path)}
+    start = time.perf_counter()
+    image_sizes = probe_image_sizes(sorted(existing_paths))
+    carb.log_info(f"Probed {len(image_sizes)} images in {time.perf_counter() - start:.3f}s")
+
+    transforms = {}
+    for prim_path, config in configs.items():
+        report = reports[prim_path]
+        report.missing_files = [
+            image_path for image_path in config.expanded_glob if image_path not in existing_paths
+        ]
+        report.unreadable_files = [
+            image_path
+            for image_path in config.expanded_glob
+            if image_path in existing_paths and image_path not in image_sizes
+        ]
+        expanded_glob = set(config.expanded_glob)
+        report.new_files = sorted(
+            image_path for image_path in glob(config.path_glob) if image_path not in expanded_glob
+        )
+        report.skipped = len(report.missing_files) > 0 or len(report.unreadable_files) > 0
+        if report.skipped:
+            carb.log_warn(
+                f"{prim_path} references {len(report.missing_files)} missing and "
+                f"{len(report.unreadable_files)} unreadable files, skipping"
+            )
+            continue
+        start = time.perf_counter()
+        transforms[prim_path] = calculate_transforms(config, image_sizes)
+        report.layout_seconds = time.perf_counter() - start
+
+    applied: List[str] = []
+    with Sdf.ChangeBlock():
+        for prim_path, prim_transforms in transforms.items():
+            report = reports[prim_path]
+            config = configs[prim_path]
+            start = time.perf_counter()
+            prim: Usd.Prim = stage.GetPrimAtPath(prim_path)
+            changed = None
+            if prim.IsValid():
+                changed = apply_image_sequence_transforms(stage, Sdf.Path(prim_path), config, prim_transforms)
+            report.apply_seconds = time.perf_counter() - start
+            if changed is None:
+                # Nothing was written, so keep the old config to match the quads
+                report.skipped = True
+                report.error = f"{prim_path} does not match its config, unable to apply the layout"
+                carb.log_warn(report.error)
+                continue
+            set_config_metadata(prim, config)
+            report.changed_prim_count = changed
+            applied.append(prim_path)
+    # Reuse the transforms we already have rather than reprobing on the next query
+    for prim_path in applied:
+        update_spatial_index(stage, Sdf.Path(prim_path), configs[prim_path], transforms[prim_path])
@@ -0,0 +1,53 @@
+__all__ = ["RelayoutImageSequencesCommand"]
+
+from typing import Dict, Optional
+
+import omni.kit.commands
+import omni.usd
+from pxr import Usd
+
+from .bulk import ImageSequenceReport, layout_image_sequences, relayout_image_sequences
+from .config import Config
+
+
+class RelayoutImageSequencesCommand(omni.kit.commands.Command):
+    """
+    Relayout every image sequence on the stage in one pass.
+
+    Usage:
+        omni.kit.commands.execute("RelayoutImageSequences", ppi=300, gap_pct=0.05)
+    """
+
+    def __init__(
+        self,
+        ppi: Optional[int] = None,
+        gap_pct: Optional[float] = None,
+        curve_pct: Optional[float] = None,
+        images_per_row: Optional[int] = None,
+        usd_context_name: str = "",
+    ):
+        self._ppi = ppi
+        self._gap_pct = gap_pct
+        self._curve_pct = curve_pct
+        self._images_per_row = images_per_row
+        self._usd_context_name = usd_context_name
+        self._previous_configs: Dict[str, Config] = {}
+
+    def do(self) -> Dict[str, ImageSequenceReport]:
+        stage: Usd.Stage = omni.usd.get_context(self._usd_context_name).get_stage()
+        reports = relayout_image_sequences(
+            stage,
+            ppi=self._ppi,
+            gap_pct=self._gap_pct,
+            curve_pct=self._curve_pct,
+            images_per_row=self._images_per_row,
+        )
+        # Sequences that were skipped have nothing to restore
+        self._previous_configs = {
+            prim_path: report.previous_config for prim_path, report in reports.items() if not report.skipped
+        }
+        return reports
+
+    def undo(self) -> None:
+        stage: Usd.Stage = omni.usd.get_context(self._usd_context_name).get_stage()
+        layout_image_sequences(stage, self._previous_configs)
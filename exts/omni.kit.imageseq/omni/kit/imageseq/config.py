@@ -1,4 +1,5 @@
 import codecs
+import hashlib
 import pickle
 from typing import List
 
@@ -22,6 +23,11 @@ def set_config_metadata(prim: Usd.Prim, config: Config) -> None:
     if not attribute.IsValid():
         attribute = prim.CreateAttribute("imageseq:config", Sdf.ValueTypeNames.String)
     attribute.Set(config_str)
+    # A short digest of the config, so readers can detect layout changes without decoding it
+    hash_attribute: Usd.Attribute = prim.GetAttribute("imageseq:configHash")
+    if not hash_attribute.IsValid():
+        hash_attribute = prim.CreateAttribute("imageseq:configHash", Sdf.ValueTypeNames.String)
+    hash_attribute.Set(hashlib.sha1(config_str).hexdigest())
 
 def get_config_metadata(prim: Usd.Prim) -> Config:
     if not prim.IsValid():
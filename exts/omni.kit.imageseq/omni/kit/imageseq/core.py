@@ -1,6 +1,6 @@
 import math
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 import carb
 from PIL import Image
@@ -65,19 +65,40 @@ class Transform:
     scale: Gf.Vec2d = Gf.Vec3d(1, 1, 1)
     rotate: Gf.Vec2d = Gf.Vec3d(0, 0, 0)
 
-def calculate_transforms(config: Config) -> Dict[str, Transform]:
+def probe_image_sizes(image_paths: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+    # Only the image header is read, and each unique path is opened once
+    image_sizes: Dict[str, Tuple[int, int]] = {}
+    for image_path in image_paths:
+        if image_path in image_sizes:
+            continue
+        # Unreadable images are left out, callers check for the missing keys
+        try:
+            with Image.open(image_path) as image:
+                image_sizes[image_path] = image.size
+        except (OSError, ValueError) as e:
+            carb.log_warn(f"Unable to read image {image_path}: {e}")
+    return image_sizes
+
+def calculate_transforms(
+    config: Config, image_sizes: Optional[Dict[str, Tuple[int, int]]] = None
+) -> Dict[str, Transform]:
     INCHES_TO_CM = 1.54
-    images: List[Image.Image] = [Image.open(image_path_str) for image_path_str in config.expanded_glob]
-    image_count = len(images)
+    if image_sizes is None:
+        image_sizes = probe_image_sizes(config.expanded_glob)
+    unreadable = [image_path for image_path in config.expanded_glob if image_path not in image_sizes]
+    if len(unreadable) > 0:
+        raise OSError(f"Unable to read images: {', '.join(unreadable)}")
+    sizes: List[Tuple[int, int]] = [image_sizes[image_path] for image_path in config.expanded_glob]
+    image_count = len(sizes)
     if image_count == 0:
         return {}
     # Calculate the largest image width in cm
-    max_image_width_px = max([image.size[0] for image in images])
+    max_image_width_px = max([size[0] for size in sizes])
     max_image_width_in = max_image_width_px / config.ppi
     max_image_width_cm = max_image_width_in * INCHES_TO_CM
 
     # Calculate the largest image height in cm
-    max_image_height_px = max([image.size[1] for image in images])
+    max_image_height_px = max([size[1] for size in sizes])
     max_image_height_in = max_image_height_px / config.ppi
     max_image_height_cm = max_image_height_in * INCHES_TO_CM
 
@@ -103,13 +124,13 @@ def calculate_transforms(config: Config) -> Dict[str, Transform]:
     transforms: Dict[str, Transform] = {}
 
     seen = 0
-    for count, image in enumerate(images):
+    for image_path, size in zip(config.expanded_glob, sizes):
         if seen > images_per_row - 1:
             left_current_cm = left_most_cm
             top_current_cm -= max_image_height_cm + image_gap_cm
             seen = 0
-        image_width_px = image.size[0]
-        image_height_px = image.size[1]
+        image_width_px = size[0]
+        image_height_px = size[1]
         image_width_in = image_width_px / config.ppi
         image_height_in = image_height_px / config.ppi
         image_width_cm = image_width_in * INCHES_TO_CM
@@ -132,7 +153,7 @@ def calculate_transforms(config: Config) -> Dict[str, Transform]:
 
         transform.rotate = Gf.Vec3d(0, angle, 0)
 
-        transforms[image.filename] = transform
+        transforms[image_path] = transform
 
         left_current_cm += max_image_width_cm + image_gap_cm
         seen += 1
@@ -170,6 +191,10 @@ def create_image_sequence_group_prim(stage: Usd.Stage, root_prim_path: Sdf.Path,
             rotate=transform.rotate,
             image_path=asset_path,
         )
+    # Imported here since the spatial module builds on this one
+    from .spatial import update_spatial_index
+
+    update_spatial_index(stage, root_prim_path, config, transforms)
     return prim
 
 def update_image_sequence_prims(stage: Usd.Stage, root_prim_path: Sdf.Path, config: Config) -> None:
@@ -180,26 +205,70 @@ def update_image_sequence_prims(stage: Usd.Stage, root_prim_path: Sdf.Path, conf
     if not top_prim.IsValid():
         carb.log_warn("Unexpected: prim is invalid")
         return
-    set_config_metadata(top_prim, config)
     transforms = calculate_transforms(config)
-    # Create a child prim for each image
+    if apply_image_sequence_transforms(stage, root_prim_path, config, transforms) is None:
+        return
+    set_config_metadata(top_prim, config)
+    # Imported here since the spatial module builds on this one
+    from .spatial import update_spatial_index
+
+    update_spatial_index(stage, root_prim_path, config, transforms)
+    return
+
+def apply_image_sequence_transforms(
+    stage: Usd.Stage, root_prim_path: Sdf.Path, config: Config, transforms: Dict[str, Transform]
+) -> Optional[int]:
+    # Returns the number of image prims whose transform actually changed, or None
+    # without writing anything if any of the prims could not be found
+    targets: List[List[Tuple[Union[Usd.Attribute, Sdf.AttributeSpec], Gf.Vec3d]]] = []
     for image in config.expanded_glob:
         image_path = Path(image)
         transform: Transform = transforms[image]
         image_prim_path: Sdf.Path = root_prim_path.AppendChild(make_safe_prim_name(image_path.stem))
         mesh_prim_path: Sdf.Path = image_prim_path.AppendChild("ImageSequenceMesh")
         image_prim: Usd.Prim = stage.GetPrimAtPath(image_prim_path)
-        mesh_prim: Usd.Prim = stage.GetPrimAtPath(mesh_prim_path)
         if not image_prim.IsValid():
             carb.log_warn(f"Unexpected: {image_prim_path} is invalid")
-            return
-        if not mesh_prim.IsValid():
-            carb.log_warn(f"Unexpected: {mesh_prim_path} is invalid")
-            return
-        image_prim.GetAttribute("xformOp:translate").Set(transform.translate)
-        mesh_prim.GetAttribute("xformOp:scale").Set(transform.scale)
-        image_prim.GetAttribute("xformOp:rotateXYZ").Set(transform.rotate)
-    return
+            return None
+        if image_prim.IsActive():
+            mesh_prim: Usd.Prim = stage.GetPrimAtPath(mesh_prim_path)
+            if not mesh_prim.IsValid():
+                carb.log_warn(f"Unexpected: {mesh_prim_path} is invalid")
+                return None
+            scale_attr = mesh_prim.GetAttribute("xformOp:scale")
+        else:
+            # The mesh of a culled (deactivated) quad is not composed, so write its spec directly
+            scale_attr = stage.GetEditTarget().GetPropertySpecForScenePath(
+                mesh_prim_path.AppendProperty("xformOp:scale")
+            )
+            if scale_attr is None:
+                carb.log_warn(f"Unexpected: {mesh_prim_path} has no scale in the edit target")
+                return None
+        targets.append(
+            [
+                (image_prim.GetAttribute("xformOp:translate"), transform.translate),
+                (scale_attr, transform.scale),
+                (image_prim.GetAttribute("xformOp:rotateXYZ"), transform.rotate),
+            ]
+        )
+    changed = 0
+    for target in targets:
+        prim_changed = False
+        for attr, value in target:
+            # The scale and rotate ops are float3, so compare in the attribute's own precision
+            if isinstance(attr, Sdf.AttributeSpec):
+                value = type(attr.typeName.defaultValue)(value)
+                if attr.default != value:
+                    attr.default = value
+                    prim_changed = True
+                continue
+            current = attr.Get()
+            if current is None or current != type(current)(value):
+                attr.Set(value)
+                prim_changed = True
+        if prim_changed:
+            changed += 1
+    return changed
 
 def make_safe_prim_name(name: str, replace: str = "_") -> str:
     for c in ["-", ".", "?"]:
@@ -3,10 +3,13 @@ from functools import partial
 
 import omni.ext
 import omni.kit.app
+import omni.kit.commands
 import omni.kit.ui
 import omni.ui
 import omni.usd
 
+from . import commands
+from .spatial import clear_spatial_indices
 from .window import KitImageSequenceWindow
 
 
@@ -15,6 +18,11 @@ class KitImageSequenceExtension(omni.ext.IExt):
     MENU_PATH = f"Window/{WINDOW_NAME}"
 
     def on_startup(self):
+        omni.kit.commands.register_all_commands_in_module(commands)
+        stage_event_stream = omni.usd.get_context().get_stage_event_stream()
+        self._stage_event_sub = stage_event_stream.create_subscription_to_pop(
+            self._on_stage_event, name="kit-imageseq-spatial-index"
+        )
         # The ability to show up the window if the system requires it. We use it
         # in QuickLayout.
         self._window = None
@@ -42,6 +50,16 @@ class KitImageSequenceExtension(omni.ext.IExt):
         # Deregister the function that shows the window from omni.ui
         omni.ui.Workspace.set_show_window_fn(KitImageSequenceExtension.WINDOW_NAME, None)
 
+        omni.kit.commands.unregister_module_commands(commands)
+        self._stage_event_sub.unsubscribe()
+        self._stage_event_sub = None
+        clear_spatial_indices()
+
+    def _on_stage_event(self, event):
+        # The cached spatial indices belong to the stage that is going away
+        if event.type == int(omni.usd.StageEventType.CLOSED):
+            clear_spatial_indices()
+
     def _set_menu(self, value):
         """Set the menu to create this window on and off"""
         editor_menu = omni.kit.ui.get_editor_menu()
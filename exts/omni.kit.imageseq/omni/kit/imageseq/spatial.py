@@ -0,0 +1,314 @@
+__all__ = [
+    "SpatialIndex",
+    "get_spatial_index",
+    "update_spatial_index",
+    "clear_spatial_indices",
+    "query_image_sequence_frustum",
+    "query_image_sequence_range",
+    "pick_image_sequence",
+    "cull_image_sequence_to_frustum",
+    "reset_image_sequence_culling",
+]
+
+import math
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import carb
+from pxr import Gf, Sdf, Usd, UsdGeom
+
+from .config import Config, get_config_metadata
+from .core import Transform, calculate_transforms, make_safe_prim_name, probe_image_sizes
+
+# The quad points of create_quad_mesh, before the mesh scale is applied
+QUAD_POINTS = [Gf.Vec3d(-0.5, -0.5, 0.0), Gf.Vec3d(0.5, -0.5, 0.0), Gf.Vec3d(0.5, 0.5, 0.0), Gf.Vec3d(-0.5, 0.5, 0.0)]
+
+# Quads per BVH leaf
+LEAF_SIZE = 8
+
+
+class SpatialIndex:
+    """
+    Bounding volume hierarchy over the quads of one image sequence, in the local
+    space of the sequence root prim. Every query descends only into the nodes
+    whose bounds pass the test, so its cost scales with the number of hits
+    rather than with the size of the sequence.
+    """
+
+    def __init__(self, config: Config, transforms: Dict[str, Transform]):
+        self.image_paths: List[str] = []
+        self.ranges: List[Gf.Range3d] = []
+        self.boxes: List[Gf.BBox3d] = []
+        self.corners: List[List[Gf.Vec3d]] = []
+        # Quads in the same column share a rotation, and building it is the slow part
+        rotations: Dict[Tuple[float, float, float], Gf.Matrix4d] = {}
+        for image_path in config.expanded_glob:
+            transform = transforms.get(image_path)
+            if transform is None:
+                continue
+            rotate = (transform.rotate[0], transform.rotate[1], transform.rotate[2])
+            rotation = rotations.get(rotate)
+            if rotation is None:
+                rotation = rotations[rotate] = rotate_matrix(transform.rotate)
+            matrix = Gf.Matrix4d().SetScale(transform.scale) * rotation
+            matrix.SetTranslateOnly(transform.translate)
+            corners = [matrix.Transform(point) for point in QUAD_POINTS]
+            quad_range = Gf.Range3d()
+            for corner in corners:
+                quad_range.UnionWith(corner)
+            self.image_paths.append(image_path)
+            self.ranges.append(quad_range)
+            self.boxes.append(Gf.BBox3d(quad_range))
+            self.corners.append(corners)
+
+        # Nodes are stored in flat lists, the root is node 0. Inner nodes have
+        # two children and no items, leaves have items and no children.
+        self._node_ranges: List[Gf.Range3d] = []
+        self._node_boxes: List[Gf.BBox3d] = []
+        self._node_children: List[Optional[Tuple[int, int]]] = []
+        self._node_items: List[Optional[List[int]]] = []
+        # Plain floats, the split sort indexes these far more often than Gf.Vec3d would like
+        self._midpoints: List[Tuple[float, float, float]] = []
+        for quad_range in self.ranges:
+            midpoint = quad_range.GetMidpoint()
+            self._midpoints.append((midpoint[0], midpoint[1], midpoint[2]))
+        if self.ranges:
+            self._build(list(range(len(self.ranges))))
+
+    @property
+    def bounds(self) -> Gf.Range3d:
+        return self._node_ranges[0] if self._node_ranges else Gf.Range3d()
+
+    def _build(self, items: List[int]) -> int:
+        node_range = Gf.Range3d()
+        for item in items:
+            node_range.UnionWith(self.ranges[item])
+        node = len(self._node_ranges)
+        self._node_ranges.append(node_range)
+        self._node_boxes.append(Gf.BBox3d(node_range))
+        self._node_children.append(None)
+        self._node_items.append(None)
+        if len(items) <= LEAF_SIZE:
+            self._node_items[node] = items
+            return node
+        # Median split along the longest axis
+        size = node_range.GetSize()
+        axis = max(range(3), key=lambda a: size[a])
+        items = sorted(items, key=lambda item: self._midpoints[item][axis])
+        half = len(items) // 2
+        left = self._build(items[:half])
+        right = self._build(items[half:])
+        self._node_children[node] = (left, right)
+        return node
+
+    def _query(self, node_test: Callable[[int], bool], item_test: Callable[[int], bool]) -> List[int]:
+        found: List[int] = []
+        stack = [0] if self._node_ranges else []
+        while stack:
+            node = stack.pop()
+            if not node_test(node):
+                continue
+            items = self._node_items[node]
+            if items is None:
+                stack.extend(self._node_children[node])
+            else:
+                found.extend(item for item in items if item_test(item))
+        found.sort()
+        return found
+
+    def query_range(self, query: Gf.Range3d) -> List[str]:
+        def overlaps(other: Gf.Range3d) -> bool:
+            return not Gf.Range3d.GetIntersection(other, query).IsEmpty()
+
+        items = self._query(lambda node: overlaps(self._node_ranges[node]), lambda item: overlaps(self.ranges[item]))
+        return [self.image_paths[item] for item in items]
+
+    def query_frustum(self, frustum: Gf.Frustum, min_angular_size: float = 0.0) -> List[str]:
+        # min_angular_size is the quad diagonal over its distance to the eye, in radians
+        eye = frustum.GetPosition()
+
+        def item_test(item: int) -> bool:
+            if not frustum.Intersects(self.boxes[item]):
+                return False
+            if min_angular_size > 0.0:
+                quad_range = self.ranges[item]
+                distance = (quad_range.GetMidpoint() - eye).GetLength()
+                if distance > 0.0 and quad_range.GetSize().GetLength() / distance < min_angular_size:
+                    return False
+            return True
+
+        items = self._query(lambda node: frustum.Intersects(self._node_boxes[node]), item_test)
+        return [self.image_paths[item] for item in items]
+
+    def pick(self, ray: Gf.Ray) -> Optional[str]:
+        def hits(quad_range: Gf.Range3d) -> bool:
+            hit, _, exit_distance = ray.Intersect(quad_range)
+            return hit and exit_distance >= 0.0
+
+        nearest: Optional[str] = None
+        nearest_distance = math.inf
+        items = self._query(lambda node: hits(self._node_ranges[node]), lambda item: hits(self.ranges[item]))
+        for item in items:
+            p0, p1, p2, p3 = self.corners[item]
+            for triangle in ((p0, p1, p2), (p0, p2, p3)):
+                hit, distance, _, _ = ray.Intersect(*triangle)
+                if hit and distance < nearest_distance:
+                    nearest = self.image_paths[item]
+                    nearest_distance = distance
+        return nearest
+
+
+def rotate_matrix(rotate: Gf.Vec3d) -> Gf.Matrix4d:
+    # Matches the rotateXYZ xformOp written by create_textured_quad_prim
+    rotate_x = Gf.Matrix4d().SetRotate(Gf.Rotation(Gf.Vec3d(1, 0, 0), rotate[0]))
+    rotate_y = Gf.Matrix4d().SetRotate(Gf.Rotation(Gf.Vec3d(0, 1, 0), rotate[1]))
+    rotate_z = Gf.Matrix4d().SetRotate(Gf.Rotation(Gf.Vec3d(0, 0, 1), rotate[2]))
+    return rotate_x * rotate_y * rotate_z
+
+
+# Keyed by (root layer identifier, root prim path) and holding the fingerprint
+# of the config the index was built from, so a layout change invalidates it
+_spatial_indices: Dict[Tuple[str, str], Tuple[Optional[str], SpatialIndex]] = {}
+
+
+def clear_spatial_indices() -> None:
+    _spatial_indices.clear()
+
+
+def _config_fingerprint(prim: Usd.Prim) -> Optional[str]:
+    attribute: Usd.Attribute = prim.GetAttribute("imageseq:configHash")
+    if attribute.IsValid():
+        return attribute.Get()
+    # Sequences written before the hash was stored fall back to the full config
+    attribute = prim.GetAttribute("imageseq:config")
+    if not attribute.IsValid():
+        return None
+    return attribute.Get()
+
+
+def update_spatial_index(
+    stage: Usd.Stage, root_prim_path: Sdf.Path, config: Config, transforms: Dict[str, Transform]
+) -> SpatialIndex:
+    # Drop the indices of stages that have since been closed
+    for key in [key for key in _spatial_indices if Sdf.Layer.Find(key[0]) is None]:
+        del _spatial_indices[key]
+    prim: Usd.Prim = stage.GetPrimAtPath(root_prim_path)
+    spatial_index = SpatialIndex(config, transforms)
+    key = (stage.GetRootLayer().identifier, str(root_prim_path))
+    _spatial_indices[key] = (_config_fingerprint(prim), spatial_index)
+    return spatial_index
+
+
+def get_spatial_index(stage: Usd.Stage, root_prim_path: Sdf.Path) -> Optional[SpatialIndex]:
+    prim: Usd.Prim = stage.GetPrimAtPath(root_prim_path)
+    if not prim.IsValid():
+        carb.log_warn(f"Unexpected: {root_prim_path} is invalid")
+        return None
+    fingerprint = _config_fingerprint(prim)
+    if fingerprint is None:
+        return None
+    key = (stage.GetRootLayer().identifier, str(root_prim_path))
+    cached = _spatial_indices.get(key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    config = get_config_metadata(prim)
+    image_sizes = probe_image_sizes(config.expanded_glob)
+    if len(image_sizes) != len(set(config.expanded_glob)):
+        carb.log_warn(f"{root_prim_path} references missing or unreadable files, unable to build its spatial index")
+        return None
+    return update_spatial_index(stage, root_prim_path, config, calculate_transforms(config, image_sizes))
+
+
+def _world_to_local(stage: Usd.Stage, root_prim_path: Sdf.Path) -> Gf.Matrix4d:
+    xformable = UsdGeom.Xformable(stage.GetPrimAtPath(root_prim_path))
+    return xformable.ComputeLocalToWorldTransform(Usd.TimeCode.Default()).GetInverse()
+
+
+def query_image_sequence_range(stage: Usd.Stage, root_prim_path: Sdf.Path, query: Gf.Range3d) -> List[str]:
+    spatial_index = get_spatial_index(stage, root_prim_path)
+    if spatial_index is None:
+        return []
+    local_query = Gf.BBox3d(query, _world_to_local(stage, root_prim_path)).ComputeAlignedRange()
+    return spatial_index.query_range(local_query)
+
+
+def query_image_sequence_frustum(
+    stage: Usd.Stage, root_prim_path: Sdf.Path, frustum: Gf.Frustum, min_angular_size: float = 0.0
+) -> List[str]:
+    spatial_index = get_spatial_index(stage, root_prim_path)
+    if spatial_index is None:
+        return []
+    local_frustum = Gf.Frustum(frustum).Transform(_world_to_local(stage, root_prim_path))
+    return spatial_index.query_frustum(local_frustum, min_angular_size)
+
+
+def pick_image_sequence(stage: Usd.Stage, root_prim_path: Sdf.Path, ray: Gf.Ray) -> Optional[str]:
+    spatial_index = get_spatial_index(stage, root_prim_path)
+    if spatial_index is None:
+        return None
+    local_ray = Gf.Ray(ray.startPoint, ray.direction).Transform(_world_to_local(stage, root_prim_path))
+    return spatial_index.pick(local_ray)
+
+
+def _set_quads_shown(
+    stage: Usd.Stage, root_prim_path: Sdf.Path, image_paths: List[str], shown: Set[str], deactivate: bool
+) -> int:
+    # Shown quads get both culling opinions cleared rather than overwritten, so
+    # the layer ends up as it was before any culling, whichever mode culled them
+    changed = 0
+    with Sdf.ChangeBlock():
+        for image_path in image_paths:
+            image_prim_path = root_prim_path.AppendChild(make_safe_prim_name(Path(image_path).stem))
+            image_prim: Usd.Prim = stage.GetPrimAtPath(image_prim_path)
+            if not image_prim.IsValid():
+                continue
+            visibility_attr: Usd.Attribute = UsdGeom.Imageable(image_prim).GetVisibilityAttr()
+            prim_changed = False
+            if image_path in shown:
+                if image_prim.HasAuthoredActive():
+                    image_prim.ClearActive()
+                    prim_changed = True
+                if visibility_attr.HasAuthoredValue():
+                    # The quads never author visibility themselves, so drop the now empty spec too
+                    visibility_attr.Clear()
+                    image_prim.RemoveProperty(UsdGeom.Tokens.visibility)
+                    prim_changed = True
+            elif deactivate:
+                if image_prim.IsActive():
+                    image_prim.SetActive(False)
+                    prim_changed = True
+            elif visibility_attr.Get() != UsdGeom.Tokens.invisible:
+                visibility_attr.Set(UsdGeom.Tokens.invisible)
+                prim_changed = True
+            if prim_changed:
+                changed += 1
+    return changed
+
+
+def cull_image_sequence_to_frustum(
+    stage: Usd.Stage,
+    root_prim_path: Sdf.Path,
+    frustum: Gf.Frustum,
+    min_angular_size: float = 0.0,
+    deactivate: bool = False,
+) -> int:
+    """
+    Show only the quads of an image sequence that intersect the given world
+    space frustum, hiding the rest. With deactivate=True the culled quads are
+    deactivated instead, so their meshes and textures are not loaded at all.
+    Returns the number of quads whose state changed.
+    """
+    spatial_index = get_spatial_index(stage, root_prim_path)
+    if spatial_index is None:
+        return 0
+    local_frustum = Gf.Frustum(frustum).Transform(_world_to_local(stage, root_prim_path))
+    shown = set(spatial_index.query_frustum(local_frustum, min_angular_size))
+    return _set_quads_shown(stage, root_prim_path, spatial_index.image_paths, shown, deactivate)
+
+
+def reset_image_sequence_culling(stage: Usd.Stage, root_prim_path: Sdf.Path) -> int:
+    spatial_index = get_spatial_index(stage, root_prim_path)
+    if spatial_index is None:
+        return 0
+    shown = set(spatial_index.image_paths)
+    return _set_quads_shown(stage, root_prim_path, spatial_index.image_paths, shown, deactivate=False)
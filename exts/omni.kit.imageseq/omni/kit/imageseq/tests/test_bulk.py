@@ -0,0 +1,150 @@
+import os
+import tempfile
+
+import omni.kit.test
+from PIL import Image
+from pxr import Sdf, Usd
+
+from omni.kit.imageseq.bulk import find_image_sequence_prims, layout_image_sequences, relayout_image_sequences
+from omni.kit.imageseq.config import Config, get_config_metadata
+from omni.kit.imageseq.core import calculate_transforms, create_image_sequence_group_prim, probe_image_sizes
+
+
+def make_config(image_paths, path_glob: str = "", images_per_row: int = 0) -> Config:
+    config = Config()
+    config.path_glob = path_glob
+    config.expanded_glob = list(image_paths)
+    config.ppi = 100
+    config.gap_pct = 0.1
+    config.curve_pct = 0.0
+    config.images_per_row = images_per_row
+    return config
+
+
+class TestBulk(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._stage = Usd.Stage.CreateInMemory()
+
+    async def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _make_images(self, prefix: str, count: int):
+        image_paths = []
+        for i in range(count):
+            image_path = os.path.join(self._tmp_dir.name, f"{prefix}{i}.png")
+            Image.new("RGB", (100 + 10 * i, 50)).save(image_path)
+            image_paths.append(image_path)
+        return image_paths
+
+    def _make_sequence(self, name: str, image_paths):
+        path_glob = os.path.join(self._tmp_dir.name, f"{name}*.png")
+        prim_path = Sdf.Path(f"/World/ImageSequences/{name}")
+        create_image_sequence_group_prim(self._stage, prim_path, make_config(image_paths, path_glob))
+        return str(prim_path)
+
+    async def test_calculate_transforms_with_image_sizes(self):
+        config = make_config(["a.png", "b.png"])
+        transforms = calculate_transforms(config, {"a.png": (100, 50), "b.png": (200, 50)})
+        self.assertEqual(set(transforms.keys()), {"a.png", "b.png"})
+        self.assertAlmostEqual(transforms["a.png"].scale[0], 1.54)
+        self.assertAlmostEqual(transforms["b.png"].scale[0], 3.08)
+        self.assertLess(transforms["a.png"].translate[0], transforms["b.png"].translate[0])
+
+    async def test_calculate_transforms_matches_probe(self):
+        image_paths = self._make_images("probe", 3)
+        config = make_config(image_paths)
+        probed = calculate_transforms(config)
+        given = calculate_transforms(config, probe_image_sizes(image_paths))
+        for image_path in image_paths:
+            self.assertEqual(probed[image_path].translate, given[image_path].translate)
+            self.assertEqual(probed[image_path].scale, given[image_path].scale)
+
+    async def test_calculate_transforms_names_unreadable_images(self):
+        image_paths = self._make_images("bad", 2)
+        with open(image_paths[1], "w") as f:
+            f.write("not an image")
+        with self.assertRaisesRegex(OSError, "bad1.png"):
+            calculate_transforms(make_config(image_paths))
+
+    async def test_probe_image_sizes(self):
+        image_paths = self._make_images("dedup", 2)
+        bad_path = os.path.join(self._tmp_dir.name, "bad.png")
+        with open(bad_path, "w") as f:
+            f.write("not an image")
+        image_sizes = probe_image_sizes(image_paths + image_paths + [bad_path])
+        self.assertEqual(image_sizes, {image_paths[0]: (100, 50), image_paths[1]: (110, 50)})
+
+    async def test_find_image_sequence_prims(self):
+        first = self._make_sequence("SeqA", self._make_images("SeqA", 2))
+        second = self._make_sequence("SeqB", self._make_images("SeqB", 3))
+        prim_paths = [str(prim.GetPath()) for prim in find_image_sequence_prims(self._stage)]
+        self.assertEqual(sorted(prim_paths), [first, second])
+
+    async def test_relayout_reports_changes(self):
+        first = self._make_sequence("SeqA", self._make_images("SeqA", 2))
+        second = self._make_sequence("SeqB", self._make_images("SeqB", 3))
+        reports = relayout_image_sequences(self._stage, ppi=200)
+        self.assertEqual(reports[first].changed_prim_count, 2)
+        self.assertEqual(reports[second].changed_prim_count, 3)
+        self.assertEqual(reports[first].previous_config.ppi, 100)
+        self.assertEqual(get_config_metadata(self._stage.GetPrimAtPath(first)).ppi, 200)
+
+        # Relaying out with the same values does not touch anything
+        reports = relayout_image_sequences(self._stage, ppi=200)
+        self.assertEqual(reports[first].changed_prim_count, 0)
+        self.assertEqual(reports[second].changed_prim_count, 0)
+
+    async def test_relayout_skips_bad_sequences(self):
+        first_images = self._make_images("SeqA", 2)
+        second_images = self._make_images("SeqB", 2)
+        third_images = self._make_images("SeqC", 2)
+        first = self._make_sequence("SeqA", first_images)
+        second = self._make_sequence("SeqB", second_images)
+        third = self._make_sequence("SeqC", third_images)
+        os.remove(first_images[0])
+        with open(second_images[1], "w") as f:
+            f.write("not an image")
+        self._make_images("SeqC_new", 1)
+
+        reports = relayout_image_sequences(self._stage, ppi=200)
+        self.assertTrue(reports[first].skipped)
+        self.assertEqual(reports[first].missing_files, [first_images[0]])
+        self.assertTrue(reports[second].skipped)
+        self.assertEqual(reports[second].unreadable_files, [second_images[1]])
+        self.assertEqual(get_config_metadata(self._stage.GetPrimAtPath(second)).ppi, 100)
+        self.assertFalse(reports[third].skipped)
+        self.assertEqual(reports[third].changed_prim_count, 2)
+        self.assertEqual(len(reports[third].new_files), 1)
+
+    async def test_relayout_leaves_broken_sequence_untouched(self):
+        image_paths = self._make_images("SeqA", 3)
+        prim_path = self._make_sequence("SeqA", image_paths)
+        mesh_path = Sdf.Path(prim_path).AppendChild("SeqA2").AppendChild("ImageSequenceMesh")
+        self._stage.RemovePrim(mesh_path)
+        translate_attr = self._stage.GetPrimAtPath(Sdf.Path(prim_path).AppendChild("SeqA0")).GetAttribute(
+            "xformOp:translate"
+        )
+        before = translate_attr.Get()
+
+        reports = relayout_image_sequences(self._stage, ppi=200, gap_pct=0.5)
+        self.assertTrue(reports[prim_path].skipped)
+        self.assertIsNotNone(reports[prim_path].error)
+        self.assertEqual(reports[prim_path].changed_prim_count, 0)
+        self.assertEqual(translate_attr.Get(), before)
+        self.assertEqual(get_config_metadata(self._stage.GetPrimAtPath(prim_path)).ppi, 100)
+
+    async def test_layout_restores_previous_configs(self):
+        image_paths = self._make_images("SeqA", 3)
+        prim_path = self._make_sequence("SeqA", image_paths)
+        translate_attr = self._stage.GetPrimAtPath(Sdf.Path(prim_path).AppendChild("SeqA0")).GetAttribute(
+            "xformOp:translate"
+        )
+        before = translate_attr.Get()
+        reports = relayout_image_sequences(self._stage, ppi=200)
+        self.assertNotEqual(translate_attr.Get(), before)
+
+        reports = layout_image_sequences(self._stage, {prim_path: reports[prim_path].previous_config})
+        self.assertEqual(reports[prim_path].changed_prim_count, 3)
+        self.assertEqual(translate_attr.Get(), before)
+        self.assertEqual(get_config_metadata(self._stage.GetPrimAtPath(prim_path)).ppi, 100)
@@ -0,0 +1,169 @@
+import os
+import tempfile
+from pathlib import Path
+
+import omni.kit.test
+from PIL import Image
+from pxr import Gf, Sdf, Usd, UsdGeom
+
+from omni.kit.imageseq.bulk import relayout_image_sequences
+from omni.kit.imageseq.config import set_config_metadata
+from omni.kit.imageseq.core import calculate_transforms, create_image_sequence_group_prim, update_image_sequence_prims
+from omni.kit.imageseq.spatial import (
+    SpatialIndex,
+    cull_image_sequence_to_frustum,
+    get_spatial_index,
+    pick_image_sequence,
+    reset_image_sequence_culling,
+)
+
+from .test_bulk import make_config
+
+
+def look_down_z(center: Gf.Vec3d, half_size: float) -> Gf.Frustum:
+    # Orthographic frustum looking down -Z at a square window around center
+    window = Gf.Range2d(Gf.Vec2d(-half_size, -half_size), Gf.Vec2d(half_size, half_size))
+    position = Gf.Vec3d(center[0], center[1], 10)
+    return Gf.Frustum(position, Gf.Rotation().SetIdentity(), window, Gf.Range1d(1, 100), Gf.Frustum.Orthographic)
+
+
+class TestSpatial(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._image_paths = [f"img{i}.png" for i in range(30)]
+        self._config = make_config(self._image_paths, images_per_row=10)
+        self._transforms = calculate_transforms(self._config, {path: (100, 100) for path in self._image_paths})
+        self._index = SpatialIndex(self._config, self._transforms)
+
+    async def tearDown(self):
+        pass
+
+    async def test_pick(self):
+        center = self._transforms["img7.png"].translate
+        self.assertEqual(self._index.pick(Gf.Ray(center + Gf.Vec3d(0, 0, 10), Gf.Vec3d(0, 0, -1))), "img7.png")
+        # Pointing away from the wall, and passing beside it
+        self.assertIsNone(self._index.pick(Gf.Ray(center + Gf.Vec3d(0, 0, 10), Gf.Vec3d(0, 0, 1))))
+        self.assertIsNone(self._index.pick(Gf.Ray(Gf.Vec3d(1000, 0, 10), Gf.Vec3d(0, 0, -1))))
+
+    async def test_query_range(self):
+        center = self._transforms["img12.png"].translate
+        query = Gf.Range3d(center - Gf.Vec3d(0.1, 0.1, 0.1), center + Gf.Vec3d(0.1, 0.1, 0.1))
+        self.assertEqual(self._index.query_range(query), ["img12.png"])
+        everything = Gf.Range3d(Gf.Vec3d(-1000, -1000, -1), Gf.Vec3d(1000, 1000, 1))
+        self.assertEqual(len(self._index.query_range(everything)), 30)
+
+    async def test_query_frustum(self):
+        center = self._transforms["img25.png"].translate
+        self.assertEqual(self._index.query_frustum(look_down_z(center, 0.5)), ["img25.png"])
+        # A perspective frustum matches testing every quad
+        frustum = Gf.Frustum()
+        frustum.SetPerspective(20, 1.0, 1, 10000)
+        frustum.SetPosition(Gf.Vec3d(3, 1, 20))
+        expected = [
+            path
+            for path, box in zip(self._index.image_paths, self._index.boxes)
+            if frustum.Intersects(box)
+        ]
+        self.assertGreater(len(expected), 0)
+        self.assertLess(len(expected), 30)
+        self.assertEqual(sorted(self._index.query_frustum(frustum)), sorted(expected))
+
+
+class TestSpatialStage(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._stage = Usd.Stage.CreateInMemory()
+        self._image_paths = []
+        for i in range(6):
+            image_path = os.path.join(self._tmp_dir.name, f"img{i}.png")
+            Image.new("RGB", (100, 100)).save(image_path)
+            self._image_paths.append(image_path)
+        self._config = make_config(self._image_paths, images_per_row=3)
+        self._prim_path = Sdf.Path("/World/ImageSequences/ImageSequence0")
+        create_image_sequence_group_prim(self._stage, self._prim_path, self._config)
+
+    async def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    async def test_index_is_cached_until_layout_changes(self):
+        spatial_index = get_spatial_index(self._stage, self._prim_path)
+        self.assertIs(get_spatial_index(self._stage, self._prim_path), spatial_index)
+        # A stale config forces a rebuild
+        self._config.ppi = 200
+        set_config_metadata(self._stage.GetPrimAtPath(self._prim_path), self._config)
+        self.assertIsNot(get_spatial_index(self._stage, self._prim_path), spatial_index)
+
+    async def test_layout_changes_update_index(self):
+        self._config.ppi = 200
+        update_image_sequence_prims(self._stage, self._prim_path, self._config)
+        # The index was built from the new layout, so it needs none of the images
+        for image_path in self._image_paths:
+            os.remove(image_path)
+        spatial_index = get_spatial_index(self._stage, self._prim_path)
+        self.assertIsNotNone(spatial_index)
+        transform = calculate_transforms(self._config, {path: (100, 100) for path in self._image_paths})
+        center = transform[self._image_paths[4]].translate
+        ray = Gf.Ray(center + Gf.Vec3d(0, 0, 10), Gf.Vec3d(0, 0, -1))
+        self.assertEqual(spatial_index.pick(ray), self._image_paths[4])
+
+    async def test_pick_in_world_space(self):
+        UsdGeom.Xformable(self._stage.GetPrimAtPath(self._prim_path)).GetOrderedXformOps()[0].Set(
+            Gf.Vec3d(100, 0, 0)
+        )
+        center = calculate_transforms(self._config)[self._image_paths[4]].translate + Gf.Vec3d(100, 0, 0)
+        ray = Gf.Ray(center + Gf.Vec3d(0, 0, 10), Gf.Vec3d(0, 0, -1))
+        self.assertEqual(pick_image_sequence(self._stage, self._prim_path, ray), self._image_paths[4])
+
+    async def test_missing_file(self):
+        os.remove(self._image_paths[0])
+        self._config.ppi = 200
+        # Change the config without touching the images so the cached index is stale
+        set_config_metadata(self._stage.GetPrimAtPath(self._prim_path), self._config)
+        self.assertIsNone(get_spatial_index(self._stage, self._prim_path))
+        ray = Gf.Ray(Gf.Vec3d(0, 0, 10), Gf.Vec3d(0, 0, -1))
+        self.assertIsNone(pick_image_sequence(self._stage, self._prim_path, ray))
+
+    async def test_cull_and_reset(self):
+        before = self._stage.GetRootLayer().ExportToString()
+        center = calculate_transforms(self._config)[self._image_paths[1]].translate
+        for deactivate in (False, True):
+            changed = cull_image_sequence_to_frustum(
+                self._stage, self._prim_path, look_down_z(center, 0.5), deactivate=deactivate
+            )
+            self.assertEqual(changed, 5)
+            self.assertEqual(reset_image_sequence_culling(self._stage, self._prim_path), 5)
+            self.assertEqual(self._stage.GetRootLayer().ExportToString(), before)
+
+    async def test_cull_modes_combine(self):
+        before = self._stage.GetRootLayer().ExportToString()
+        transforms = calculate_transforms(self._config)
+        first = look_down_z(transforms[self._image_paths[1]].translate, 0.5)
+        second = look_down_z(transforms[self._image_paths[2]].translate, 0.5)
+        # Hide, then deactivate with a frustum that shows one of the hidden quads again
+        cull_image_sequence_to_frustum(self._stage, self._prim_path, first, deactivate=False)
+        cull_image_sequence_to_frustum(self._stage, self._prim_path, second, deactivate=True)
+        shown_prim = self._stage.GetPrimAtPath(self._prim_path.AppendChild("img2"))
+        self.assertTrue(shown_prim.IsActive())
+        self.assertEqual(UsdGeom.Imageable(shown_prim).ComputeVisibility(), UsdGeom.Tokens.inherited)
+        reset_image_sequence_culling(self._stage, self._prim_path)
+        self.assertEqual(self._stage.GetRootLayer().ExportToString(), before)
+
+    async def test_relayout_culled_sequence(self):
+        center = calculate_transforms(self._config)[self._image_paths[1]].translate
+        cull_image_sequence_to_frustum(self._stage, self._prim_path, look_down_z(center, 0.5), deactivate=True)
+        reports = relayout_image_sequences(self._stage, ppi=200)
+        report = reports[str(self._prim_path)]
+        self.assertFalse(report.skipped)
+        self.assertEqual(report.changed_prim_count, 6)
+
+        reset_image_sequence_culling(self._stage, self._prim_path)
+        self._config.ppi = 200
+        transforms = calculate_transforms(self._config)
+        for image_path in self._image_paths:
+            image_prim_path = self._prim_path.AppendChild(Path(image_path).stem)
+            image_prim = self._stage.GetPrimAtPath(image_prim_path)
+            mesh_prim = self._stage.GetPrimAtPath(image_prim_path.AppendChild("ImageSequenceMesh"))
+            transform = transforms[image_path]
+            self.assertEqual(image_prim.GetAttribute("xformOp:translate").Get(), transform.translate)
+            self.assertEqual(mesh_prim.GetAttribute("xformOp:scale").Get(), Gf.Vec3f(transform.scale))
+            ray = Gf.Ray(transform.translate + Gf.Vec3d(0, 0, 10), Gf.Vec3d(0, 0, -1))
+            self.assertEqual(pick_image_sequence(self._stage, self._prim_path, ray), image_path)